@@ -0,0 +1,184 @@
+import contextlib
+import io
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import usb_ctf_generator as gen
+import usb_ctf_solution as sol
+
+CHALLENGE_TEXT = ("Hello, this is a test message for the CTF challenge. "
+                  "Can you find the hidden flag? flag{fake_flag_try_harder} "
+                  "Maybe look deeper... CTF{USB_K3yb04rd_M4st3r}")
+CHALLENGE_FLAGS = ["flag{fake_flag_try_harder}", "CTF{USB_K3yb04rd_M4st3r}"]
+
+def build_pcap(text, start=1760000000):
+    """PCAP bytes for text, written with the generator's own helpers"""
+    out = gen.create_pcap_header()
+    for i, packet in enumerate(gen.text_to_usb_data(text)):
+        usb_data = gen.create_usb_packet(packet, i)
+        out += gen.create_packet_header(len(usb_data), start + i) + usb_data
+    return out
+
+@pytest.fixture
+def challenge_pcap(tmp_path):
+    filename = tmp_path / "keyboard_capture.pcap"
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen.generate_challenge_pcap(str(filename))
+    return filename.read_bytes()
+
+def decode_in_chunks(data, size):
+    stream = sol.PcapStream()
+    scanner = sol.FlagScanner()
+    text, flags = "", []
+    for i in range(0, len(data), size):
+        chunk = sol.extract_keystrokes(stream.feed(data[i:i+size]))
+        text += chunk
+        flags += scanner.feed(chunk)
+    return text, flags, stream
+
+@pytest.mark.parametrize("size", [1, 7, 23, 37, 89, 4096])
+def test_stream_matches_whole_file(challenge_pcap, size):
+    text, flags, stream = decode_in_chunks(challenge_pcap, size)
+    assert text == CHALLENGE_TEXT
+    assert flags == CHALLENGE_FLAGS
+    # Nothing left over once every record is complete
+    assert len(stream.buffer) == 0
+
+def test_partial_record_is_held_back(challenge_pcap):
+    stream = sol.PcapStream()
+    # Global header plus one record minus its last byte
+    cut = 24 + 16 + 72 - 1
+    assert stream.feed(challenge_pcap[:cut]) == []
+    assert len(stream.feed(challenge_pcap[cut:cut+1])) == 1
+
+def test_short_global_header_waits():
+    stream = sol.PcapStream()
+    data = build_pcap("ab")
+    assert stream.feed(data[:10]) == []
+    assert not stream.header_seen
+    assert sol.extract_keystrokes(stream.feed(data[10:])) == "ab"
+
+def test_bad_magic():
+    with pytest.raises(ValueError):
+        sol.PcapStream().feed(b"\x00" * 24)
+
+def test_oversized_record_rejected():
+    header = gen.create_pcap_header()
+    record = struct.pack('<IIII', 0, 0, sol.MAX_RECORD_LEN + 1, sol.MAX_RECORD_LEN + 1)
+    with pytest.raises(ValueError):
+        sol.PcapStream().feed(header + record)
+
+def test_flag_split_across_feeds():
+    scanner = sol.FlagScanner()
+    assert scanner.feed("noise CTF{spl") == []
+    assert scanner.feed("it_flag} more") == ["CTF{split_flag}"]
+    # Already reported flags are not repeated
+    assert scanner.feed(" tail") == []
+
+def append_slowly(filename, data, size=37, delay=0.001):
+    with open(filename, 'ab') as f:
+        for i in range(0, len(data), size):
+            f.write(data[i:i+size])
+            f.flush()
+            time.sleep(delay)
+
+def test_follow_growing_file(tmp_path, capsys, challenge_pcap):
+    filename = tmp_path / "live.pcap"
+    filename.touch()
+    writer = threading.Thread(target=append_slowly, args=(filename, challenge_pcap))
+    writer.start()
+    total = sol.follow(str(filename), interval=0.005, idle_timeout=0.5)
+    writer.join()
+
+    out = capsys.readouterr().out
+    assert total == len(challenge_pcap[24:]) // (16 + 72)
+    assert "Hello, this is a test message" in out
+    for flag in CHALLENGE_FLAGS:
+        assert f"[+] Flag: {flag}" in out
+
+def test_follow_restarts_after_truncation(tmp_path, capsys):
+    filename = tmp_path / "live.pcap"
+    filename.write_bytes(build_pcap("old CTF{stale"))
+
+    def rotate():
+        time.sleep(0.2)
+        filename.write_bytes(b"")
+        time.sleep(0.2)
+        append_slowly(filename, build_pcap("rest} new CTF{fresh}", start=1770000000))
+
+    writer = threading.Thread(target=rotate)
+    writer.start()
+    sol.follow(str(filename), interval=0.005, idle_timeout=0.6)
+    writer.join()
+
+    out = capsys.readouterr().out
+    assert "Capture was truncated" in out
+    assert "[+] Flag: CTF{fresh}" in out
+    # The unfinished flag from before the restart must not be completed
+    assert "Flag: CTF{stale" not in out
+
+def test_follow_restarts_when_rewritten_past_old_offset(tmp_path, capsys):
+    filename = tmp_path / "live.pcap"
+    filename.write_bytes(build_pcap("old CTF{stale"))
+
+    def restart_in_place():
+        time.sleep(0.2)
+        # The new capture is written over the old one without the file ever
+        # getting smaller, like a writer restarting on a busy bus
+        with open(filename, 'r+b') as f:
+            f.write(build_pcap("rest} and a much longer new capture CTF{fresh}", start=1770000000))
+
+    writer = threading.Thread(target=restart_in_place)
+    writer.start()
+    sol.follow(str(filename), interval=0.005, idle_timeout=0.6)
+    writer.join()
+
+    out = capsys.readouterr().out
+    assert "starting over" in out
+    assert "Corrupt" not in out
+    assert "[+] Flag: CTF{fresh}" in out
+    assert "Flag: CTF{stale" not in out
+
+def test_follow_reopens_replaced_file(tmp_path, capsys):
+    filename = tmp_path / "live.pcap"
+    filename.write_bytes(build_pcap("old "))
+
+    def rotate():
+        time.sleep(0.2)
+        rotated = tmp_path / "new.pcap"
+        rotated.write_bytes(build_pcap("new CTF{rotated}", start=1770000000))
+        os.replace(rotated, filename)
+
+    writer = threading.Thread(target=rotate)
+    writer.start()
+    sol.follow(str(filename), interval=0.005, idle_timeout=0.6)
+    writer.join()
+
+    out = capsys.readouterr().out
+    assert "replaced, reopening" in out
+    assert "[+] Flag: CTF{rotated}" in out
+
+def test_runs_when_copied_out_of_the_repo(tmp_path, challenge_pcap):
+    # The readme has people copy the script on its own as solution.py
+    shutil.copy(sol.__file__, tmp_path / "solution.py")
+    (tmp_path / "cap.pcap").write_bytes(challenge_pcap)
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    res = subprocess.run([sys.executable, "solution.py", "cap.pcap"], cwd=tmp_path,
+                         env=env, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    assert "CTF{USB_K3yb04rd_M4st3r}" in res.stdout
+
+def test_profiling_options_inside_repo(tmp_path, challenge_pcap):
+    (tmp_path / "cap.pcap").write_bytes(challenge_pcap)
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    res = subprocess.run([sys.executable, sol.__file__, "--timings", "cap.pcap"], cwd=tmp_path,
+                         env=env, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    assert "Stage timings" in res.stderr
@@ -4,9 +4,34 @@ USB Forensics CTF Challenge Generator
 Creates a PCAP file with USB keyboard traffic containing a hidden flag
 """
 
+import argparse
+import contextlib
+import importlib.util
 import struct
 import time
+import types
 from datetime import datetime
+from pathlib import Path
+
+def load_profiling():
+    """Shared profiling helpers from the repository root, None if copied out"""
+    path = Path(__file__).resolve().parent.parent / "ctf_profiling.py"
+    if not path.is_file():
+        return None
+    spec = importlib.util.spec_from_file_location("ctf_profiling", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+ctf_profiling = load_profiling()
+
+# Default for generate_challenge_pcap(), so library callers pay nothing
+if ctf_profiling:
+    NO_TIMINGS = ctf_profiling.DISABLED
+else:
+    NO_TIMINGS = types.SimpleNamespace(
+        enabled=False,
+        stage=lambda name: contextlib.nullcontext(types.SimpleNamespace(records=0, nbytes=0)))
 
 # USB HID Keyboard scan codes (US layout)
 KEYMAP = {
@@ -87,7 +112,7 @@ def create_usb_packet(usb_data, seq_num):
     # Add HID data
     return urb_header + bytes(usb_data)
 
-def generate_challenge_pcap(filename="keyboard_capture.pcap"):
+def generate_challenge_pcap(filename="keyboard_capture.pcap", timings=NO_TIMINGS):
     """Generate the CTF challenge PCAP file"""
     
     # The trick: mix real keystrokes with decoy text
@@ -105,10 +130,12 @@ def generate_challenge_pcap(filename="keyboard_capture.pcap"):
     full_text = decoy_text + real_flag
     
     # Convert to USB packets
-    usb_packets = text_to_usb_data(full_text)
+    with timings.stage("text_to_usb_data") as st:
+        usb_packets = text_to_usb_data(full_text)
+        st.records = len(full_text)
     
     # Create PCAP file
-    with open(filename, 'wb') as f:
+    with timings.stage("write pcap") as st, open(filename, 'wb') as f:
         # Write global header
         f.write(create_pcap_header())
         
@@ -123,10 +150,23 @@ def generate_challenge_pcap(filename="keyboard_capture.pcap"):
             
             f.write(packet_header)
             f.write(usb_data)
+        st.records = len(usb_packets)
     
     print(f"[+] Challenge PCAP generated: {filename}")
     print(f"[+] Total packets: {len(usb_packets)}")
     print(f"[+] Flag hidden in the capture!")
 
+def main():
+    parser = argparse.ArgumentParser(description="Generate the USB keyboard CTF capture")
+    parser.add_argument("filename", nargs="?", default="keyboard_capture.pcap",
+                        help="output PCAP file (default: keyboard_capture.pcap)")
+    if ctf_profiling:
+        ctf_profiling.add_arguments(parser)
+    args = parser.parse_args()
+    
+    session = ctf_profiling.session(args) if ctf_profiling else contextlib.nullcontext(NO_TIMINGS)
+    with session as timings:
+        generate_challenge_pcap(args.filename, timings)
+
 if __name__ == "__main__":
-    generate_challenge_pcap()
+    main()
@@ -4,8 +4,37 @@ USB Forensics CTF Challenge - Solution Script
 Extracts keystrokes from USB keyboard packet capture
 """
 
+import argparse
+import contextlib
+import importlib.util
+import os
+import re
+import stat
 import struct
 import sys
+import time
+import types
+from pathlib import Path
+
+def load_profiling():
+    """Shared profiling helpers from the repository root, None if copied out"""
+    path = Path(__file__).resolve().parent.parent / "ctf_profiling.py"
+    if not path.is_file():
+        return None
+    spec = importlib.util.spec_from_file_location("ctf_profiling", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+ctf_profiling = load_profiling()
+
+# Default for follow(), a bare no-op when the profiling helpers are absent
+if ctf_profiling:
+    NO_TIMINGS = ctf_profiling.DISABLED
+else:
+    NO_TIMINGS = types.SimpleNamespace(
+        enabled=False,
+        stage=lambda name: contextlib.nullcontext(types.SimpleNamespace(records=0, nbytes=0)))
 
 # USB HID Keyboard scan codes (US layout)
 KEYMAP = {
@@ -23,6 +52,16 @@ KEYMAP = {
     0x36: [',', '<'], 0x37: ['.', '>'], 0x38: ['/', '?'], 0x39: ['CAPS', 'CAPS']
 }
 
+FLAG_RE = re.compile(r'[Cc][Tt][Ff]\{[^}]+\}|[Ff][Ll][Aa][Gg]\{[^}]+\}')
+
+# Follow mode limits: nothing longer than this is kept between reads
+MAX_RECORD_LEN = 262144
+MAX_FLAG_LEN = 256
+READ_SIZE = 65536
+# Global header plus the first record header, whose timestamp tells two
+# captures written to the same file apart
+FINGERPRINT_LEN = 24 + 16
+
 def parse_pcap(filename):
     """Parse PCAP file and extract USB HID data"""
     with open(filename, 'rb') as f:
@@ -85,19 +124,197 @@ def extract_keystrokes(packets):
     
     return ''.join(keystrokes)
 
+class PcapStream:
+    """Incremental PCAP parser for captures that are still being written"""
+    
+    def __init__(self):
+        self.buffer = bytearray()
+        self.header_seen = False
+    
+    def feed(self, data):
+        """Add raw bytes and return the USB HID packets of all complete records"""
+        buf = self.buffer
+        buf += data
+        offset = 0
+        
+        if not self.header_seen:
+            if len(buf) < 24:
+                return []
+            magic = struct.unpack_from('<I', buf, 0)[0]
+            if magic != 0xa1b2c3d4:
+                raise ValueError("Invalid PCAP file")
+            self.header_seen = True
+            offset = 24
+        
+        packets = []
+        while len(buf) - offset >= 16:
+            ts_sec, ts_usec, incl_len, orig_len = struct.unpack_from('<IIII', buf, offset)
+            if incl_len > MAX_RECORD_LEN:
+                raise ValueError(f"Corrupt PCAP record ({incl_len} bytes)")
+            
+            # Partial trailing record: keep it until the rest arrives
+            end = offset + 16 + incl_len
+            if end > len(buf):
+                break
+            
+            # Skip URB header (64 bytes) and extract HID data
+            if incl_len >= 64 + 8:
+                start = offset + 16 + 64
+                packets.append({
+                    'timestamp': ts_sec + ts_usec / 1000000.0,
+                    'data': bytes(buf[start:start+8])
+                })
+            offset = end
+        
+        del buf[:offset]
+        return packets
+
+class FlagScanner:
+    """Finds flags in text that arrives in pieces, including across pieces"""
+    
+    def __init__(self):
+        self.tail = ''
+    
+    def feed(self, text):
+        window = self.tail + text
+        # Only report matches that end in the new text, the rest were already seen
+        flags = [m.group(0) for m in FLAG_RE.finditer(window) if m.end() > len(self.tail)]
+        self.tail = window[-MAX_FLAG_LEN:]
+        return flags
+
+def capture_restarted(f, head):
+    """True if a followed file was truncated or rewritten from the start"""
+    fd = f.fileno()
+    if os.fstat(fd).st_size < f.tell():
+        return True
+    # A writer that restarts and quickly writes past our offset never shows a
+    # smaller size, but the start of the file changes
+    return bool(head) and os.pread(fd, len(head), 0) != head
+
+def capture_replaced(f, filename):
+    """True if the path now points at a different file (e.g. log rotation)"""
+    try:
+        return os.stat(filename).st_ino != os.fstat(f.fileno()).st_ino
+    except OSError:
+        return False
+
+def follow(filename, interval=0.05, idle_timeout=None, timings=NO_TIMINGS):
+    """
+    Decode keystrokes from a growing PCAP file, pipe ('-' for stdin) or device.
+    Stops on Ctrl-C, at the end of a pipe/device, or after idle_timeout seconds
+    without new data. Returns the number of USB packets decoded.
+    """
+    if filename == '-':
+        f = sys.stdin.buffer
+    else:
+        f = open(filename, 'rb', buffering=0)
+    # Buffered readers block on read() until the buffer is full, read1() does not
+    read = getattr(f, 'read1', f.read)
+    # Only regular files can grow after EOF, pipes and devices are done
+    growing = stat.S_ISREG(os.fstat(f.fileno()).st_mode)
+    
+    stream = PcapStream()
+    scanner = FlagScanner()
+    head = b''
+    total = 0
+    last_data = time.monotonic()
+    
+    try:
+        while True:
+            data = read(READ_SIZE)
+            restart = False
+            if growing:
+                # Checked after every read, data from a rewritten file is dropped
+                if capture_restarted(f, head):
+                    print("\n[*] Capture was truncated or rewritten, starting over")
+                    f.seek(0)
+                    restart = True
+                elif not data and capture_replaced(f, filename):
+                    print("\n[*] Capture file was replaced, reopening")
+                    f.close()
+                    f = open(filename, 'rb', buffering=0)
+                    read = f.read
+                    restart = True
+            if restart:
+                # Old text must not complete flags in the new capture
+                stream = PcapStream()
+                scanner = FlagScanner()
+                head = b''
+                last_data = time.monotonic()
+                continue
+            
+            if not data:
+                if not growing:
+                    break
+                if idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+                    break
+                time.sleep(interval)
+                continue
+            last_data = time.monotonic()
+            if len(head) < FINGERPRINT_LEN:
+                head += data[:FINGERPRINT_LEN - len(head)]
+            
+            with timings.stage("parse") as st:
+                packets = stream.feed(data)
+                st.nbytes += len(data)
+            total += len(packets)
+            with timings.stage("decode") as st:
+                text = extract_keystrokes(packets)
+                st.records += len(packets)
+            if text:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            with timings.stage("regex search") as st:
+                flags = scanner.feed(text)
+                st.nbytes += len(text)
+            for flag in flags:
+                print(f"\n[+] Flag: {flag}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(f"\n[-] {e}")
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+    
+    print(f"\n[+] Stopped after {total} USB packets")
+    return total
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python solution.py <pcap_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Extract keystrokes from a USB keyboard PCAP")
+    parser.add_argument("pcap_file", help="PCAP file ('-' for stdin with --follow)")
+    parser.add_argument("-f", "--follow", action="store_true",
+                        help="keep reading as the capture grows and print keystrokes live")
+    parser.add_argument("--interval", type=float, default=0.05,
+                        help="seconds to wait for new data in --follow mode (default: 0.05)")
+    parser.add_argument("--idle-timeout", type=float,
+                        help="stop --follow after this many seconds without new data")
+    if ctf_profiling:
+        ctf_profiling.add_arguments(parser)
+    args = parser.parse_args()
+    
+    session = ctf_profiling.session(args) if ctf_profiling else contextlib.nullcontext(NO_TIMINGS)
+    with session as timings:
+        solve(args, timings)
+
+def solve(args, timings):
+    filename = args.pcap_file
     
-    filename = sys.argv[1]
+    if args.follow:
+        print(f"[*] Following {filename} (Ctrl-C to stop)")
+        follow(filename, args.interval, args.idle_timeout, timings)
+        return
     
     print(f"[*] Parsing PCAP file: {filename}")
-    packets = parse_pcap(filename)
+    with timings.stage("parse") as st:
+        packets = parse_pcap(filename)
+        st.records = len(packets)
     print(f"[+] Found {len(packets)} USB packets")
     
     print("\n[*] Extracting keystrokes...")
-    text = extract_keystrokes(packets)
+    with timings.stage("decode") as st:
+        text = extract_keystrokes(packets)
+        st.records = len(packets)
     
     print("\n[+] Recovered text:")
     print("=" * 80)
@@ -107,8 +324,9 @@ def main():
     # Search for flags
     if 'CTF{' in text or 'flag{' in text.lower():
         print("\n[+] Flag patterns found in text!")
-        import re
-        flags = re.findall(r'[Cc][Tt][Ff]\{[^}]+\}|[Ff][Ll][Aa][Gg]\{[^}]+\}', text)
+        with timings.stage("regex search") as st:
+            flags = FLAG_RE.findall(text)
+            st.nbytes = len(text)
         for flag in flags:
             print(f"    {flag}")
 
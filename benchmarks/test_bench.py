@@ -0,0 +1,65 @@
+import argparse
+import json
+
+import pytest
+
+import bench
+
+def result(time_s, peak_bytes):
+    return {"time_s": time_s, "peak_bytes": peak_bytes}
+
+def compare(old, new, threshold=0.2, min_time=0.001, min_bytes=65536):
+    return bench.compare_results(old, new, threshold, min_time, min_bytes)
+
+def regressed(rows):
+    return [(name, n, key) for name, n, key, *_, flag in rows if flag]
+
+def test_within_threshold():
+    old = {"a": {"1000": result(1.0, 1_000_000)}}
+    new = {"a": {"1000": result(1.19, 1_190_000)}}
+    rows, missing, added = compare(old, new)
+    assert len(rows) == 2
+    assert regressed(rows) == []
+    assert missing == added == []
+
+def test_above_threshold():
+    old = {"a": {"1000": result(1.0, 1_000_000)}}
+    new = {"a": {"1000": result(1.5, 1_000_000)}}
+    assert regressed(compare(old, new)[0]) == [("a", "1000", "time_s")]
+
+def test_below_floor_is_ignored():
+    old = {"a": {"1000": result(0.0001, 1000)}}
+    new = {"a": {"1000": result(0.0009, 9000)}}
+    assert compare(old, new)[0] == []
+
+def test_growth_from_zero_is_a_regression():
+    old = {"a": {"1000": result(1.0, 0)}}
+    new = {"a": {"1000": result(1.0, 1_000_000)}}
+    assert regressed(compare(old, new)[0]) == [("a", "1000", "peak_bytes")]
+
+def test_missing_and_added_keys():
+    old = {"a": {"1000": result(1.0, 0), "10000": result(1.0, 0)}, "gone": {"1000": result(1.0, 0)}}
+    new = {"a": {"1000": result(1.0, 0)}, "fresh": {"1000": result(1.0, 0)}}
+    _, missing, added = compare(old, new)
+    assert missing == [("a", "10000"), ("gone", "1000")]
+    assert added == [("fresh", "1000")]
+
+def run_compare(tmp_path, old, new, allow_missing=False):
+    paths = []
+    for name, results in (("old.json", old), ("new.json", new)):
+        path = tmp_path / name
+        path.write_text(json.dumps({"meta": {"repeat": 5}, "results": results}))
+        paths.append(str(path))
+    args = argparse.Namespace(baseline=paths[0], current=paths[1], threshold=0.2,
+                              min_time=0.001, min_bytes=65536, allow_missing=allow_missing)
+    bench.compare_baselines(args)
+
+def test_compare_exit_codes(tmp_path):
+    old = {"a": {"1000": result(1.0, 0)}, "gone": {"1000": result(1.0, 0)}}
+    same = {"a": {"1000": result(1.0, 0)}}
+    with pytest.raises(SystemExit):
+        run_compare(tmp_path, old, same)
+    # Missing benchmarks are tolerated only on request
+    run_compare(tmp_path, old, same, allow_missing=True)
+    with pytest.raises(SystemExit):
+        run_compare(tmp_path, same, {"a": {"1000": result(2.0, 0)}})
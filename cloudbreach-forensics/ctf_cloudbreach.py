@@ -21,9 +21,25 @@ import os
 import json
 import base64
 import gzip
+import types
+import argparse
 import datetime
+import contextlib
+import importlib.util
 from pathlib import Path
 
+def load_profiling():
+    """Shared profiling helpers from the repository root, None if copied out"""
+    path = Path(__file__).resolve().parent.parent / "ctf_profiling.py"
+    if not path.is_file():
+        return None
+    spec = importlib.util.spec_from_file_location("ctf_profiling", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+ctf_profiling = load_profiling()
+
 def create_challenge_structure():
     """Create the challenge directory structure and files"""
     
@@ -38,15 +54,15 @@ def create_challenge_structure():
     
     return base_dir
 
-def generate_cloudtrail_logs(base_dir):
+def generate_cloudtrail_logs(base_dir, normal_events=50):
     """Generate suspicious CloudTrail logs with hidden indicators"""
     
     logs = []
     
     # Normal activity
-    for i in range(50):
+    for i in range(normal_events):
         logs.append({
-            "eventTime": f"2025-10-20T{10+i//10:02d}:{i%60:02d}:00Z",
+            "eventTime": f"2025-10-20T{(10+i//10)%24:02d}:{i%60:02d}:00Z",
             "eventName": "DescribeInstances",
             "userIdentity": {
                 "type": "IAMUser",
@@ -394,31 +410,44 @@ echo 'CTF{Supply_Ch4in_Compr0m1se_D3t3ct3d}' > /tmp/.flag.txt
     with open(base_dir / "SOLUTION.md", "w") as f:
         f.write(solution)
 
+# Each generate_* step with the files it writes and its progress message
+GENERATE_STEPS = [
+    (generate_cloudtrail_logs, ["logs/cloudtrail.json"], "Generated CloudTrail logs"),
+    (generate_npm_package_info, ["application/package.json", "application/setup.js"],
+     "Generated NPM package artifacts"),
+    (generate_network_pcap_text, ["network/traffic_summary.txt"], "Generated network traffic summary"),
+    (generate_memory_dump, ["memory/process_dump.txt"], "Generated memory dump"),
+    (generate_readme, ["README.md"], "Generated README"),
+    (generate_solution, ["SOLUTION.md"], "Generated solution guide"),
+]
+
 def main():
     """Generate complete CTF challenge"""
     
-    print("[*] Generating CloudBreach Forensics CTF Challenge...")
-    
-    base_dir = create_challenge_structure()
-    print(f"[+] Created directory structure: {base_dir}")
+    parser = argparse.ArgumentParser(description="Generate the CloudBreach Forensics CTF challenge")
+    if ctf_profiling:
+        ctf_profiling.add_arguments(parser)
+    args = parser.parse_args()
     
-    generate_cloudtrail_logs(base_dir)
-    print("[+] Generated CloudTrail logs")
-    
-    generate_npm_package_info(base_dir)
-    print("[+] Generated NPM package artifacts")
-    
-    generate_network_pcap_text(base_dir)
-    print("[+] Generated network traffic summary")
-    
-    generate_memory_dump(base_dir)
-    print("[+] Generated memory dump")
-    
-    generate_readme(base_dir)
-    print("[+] Generated README")
+    print("[*] Generating CloudBreach Forensics CTF Challenge...")
     
-    generate_solution(base_dir)
-    print("[+] Generated solution guide")
+    if ctf_profiling:
+        session = ctf_profiling.session(args)
+    else:
+        # Copied out on its own: same stages, nothing measured
+        session = contextlib.nullcontext(types.SimpleNamespace(
+            enabled=False, stage=lambda name: contextlib.nullcontext(types.SimpleNamespace())))
+    with session as timings:
+        with timings.stage("create_challenge_structure"):
+            base_dir = create_challenge_structure()
+        print(f"[+] Created directory structure: {base_dir}")
+        
+        for generate, outputs, message in GENERATE_STEPS:
+            with timings.stage(generate.__name__) as st:
+                generate(base_dir)
+                if timings.enabled:
+                    st.nbytes = sum((base_dir / name).stat().st_size for name in outputs)
+            print(f"[+] {message}")
     
     print(f"\n[✓] Challenge successfully created in '{base_dir}/'")
     print("\nChallenge Structure:")
@@ -0,0 +1,187 @@
+"""
+Shared profiling options for the CTF tools
+Adds --timings, --profile and --flamegraph to a command line and reports
+wall time, CPU time, throughput and peak RSS for each pipeline stage.
+The tools load this file by path from the repository root and run without
+it when copied out on their own.
+
+Usage:
+    parser = argparse.ArgumentParser()
+    ctf_profiling.add_arguments(parser)
+    args = parser.parse_args()
+    with ctf_profiling.session(args) as timings:
+        with timings.stage("parse") as st:
+            packets = parse(...)
+            st.records = len(packets)
+"""
+
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS mark (Linux only), True if it worked"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_since_reset():
+    """VmHWM from /proc/self/status in bytes, the peak since reset_peak_rss()"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return None
+
+# Where the peak can be reset, each stage reports its own peak. Elsewhere the
+# only number available is the process peak so far, which later stages inherit.
+PER_STAGE_RSS = reset_peak_rss()
+
+class Stage:
+    """Totals for one named stage, callers fill in records/nbytes as they go"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.records = 0
+        self.nbytes = 0
+        self.peak_rss = None
+
+# Handed out when timings are off so stage() costs one call and no allocation
+_NULL_STAGE = contextlib.nullcontext(Stage("disabled"))
+
+class Timings:
+    """Per-stage timings, repeated stages (e.g. one per batch) are summed"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = Stage(name)
+        if PER_STAGE_RSS:
+            reset_peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield st
+        finally:
+            st.wall += time.perf_counter() - wall
+            st.cpu += time.process_time() - cpu
+            st.calls += 1
+            rss = peak_rss_since_reset() if PER_STAGE_RSS else peak_rss()
+            if rss is not None:
+                st.peak_rss = max(st.peak_rss or 0, rss)
+
+    def report(self, out=None):
+        # Looked up at call time so redirected stderr is honoured
+        out = out or sys.stderr
+        rss_label = "stage peak RSS" if PER_STAGE_RSS else "process peak RSS"
+        print("\n[*] Stage timings", file=out)
+        print(f"    {'stage':28s} {'calls':>7s} {'wall s':>10s} {'cpu s':>10s} "
+              f"{'throughput':>18s} {rss_label:>16s}", file=out)
+        for st in self.stages.values():
+            if st.records and st.wall:
+                rate = f"{st.records / st.wall:,.0f} rec/s"
+            elif st.nbytes and st.wall:
+                rate = f"{st.nbytes / st.wall / 1048576:,.2f} MiB/s"
+            else:
+                rate = "-"
+            rss = f"{st.peak_rss / 1048576:.1f} MiB" if st.peak_rss else "-"
+            print(f"    {st.name:28s} {st.calls:7d} {st.wall:10.4f} {st.cpu:10.4f} "
+                  f"{rate:>18s} {rss:>16s}", file=out)
+
+# The no-op timings the tools pass around when --timings is not given
+DISABLED = Timings()
+
+class Sampler(threading.Thread):
+    """Samples the main thread's stack and writes folded stacks for flame graphs"""
+
+    def __init__(self, interval=0.001):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.target = threading.main_thread().ident
+        self.samples = Counter()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self, filename):
+        self.done.set()
+        self.join()
+        with open(filename, "w") as f:
+            for stack, count in self.samples.items():
+                f.write(f"{stack} {count}\n")
+
+def add_arguments(parser):
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--timings", action="store_true",
+                       help="report wall/CPU time, throughput and peak RSS per stage")
+    group.add_argument("--profile", metavar="FILE",
+                       help="write cProfile stats to FILE (view with: python3 -m pstats FILE)")
+    group.add_argument("--flamegraph", metavar="FILE",
+                       help="write sampled stacks in folded format to FILE (flamegraph.pl, speedscope)")
+
+@contextlib.contextmanager
+def session(args):
+    """Run the body under the profilers requested on the command line"""
+    timings = Timings(enabled=args.timings)
+    profiler = sampler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if args.flamegraph:
+        sampler = Sampler()
+        sampler.start()
+
+    try:
+        yield timings
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"[+] cProfile stats written to {args.profile}", file=sys.stderr)
+        if sampler:
+            sampler.stop(args.flamegraph)
+            print(f"[+] Flame graph stacks written to {args.flamegraph}", file=sys.stderr)
+        if timings.enabled:
+            timings.report()
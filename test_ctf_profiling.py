@@ -0,0 +1,45 @@
+import argparse
+
+import pytest
+
+import ctf_profiling
+
+def test_disabled_stage_is_shared_noop():
+    assert not ctf_profiling.DISABLED.enabled
+    with ctf_profiling.DISABLED.stage("a") as st:
+        st.records = 5
+    assert ctf_profiling.DISABLED.stages == {}
+
+def test_stage_totals():
+    timings = ctf_profiling.Timings(enabled=True)
+    for _ in range(3):
+        with timings.stage("parse") as st:
+            st.records += 10
+    st = timings.stages["parse"]
+    assert st.calls == 3
+    assert st.records == 30
+    assert st.wall >= 0 and st.cpu >= 0
+
+@pytest.mark.skipif(not ctf_profiling.PER_STAGE_RSS, reason="peak RSS cannot be reset here")
+def test_peak_rss_is_per_stage():
+    timings = ctf_profiling.Timings(enabled=True)
+    with timings.stage("big"):
+        block = bytearray(100 * 1048576)
+        block[::4096] = b"x" * len(block[::4096])
+        del block
+    with timings.stage("small"):
+        pass
+    # The small stage must not inherit the big stage's peak
+    assert timings.stages["small"].peak_rss < timings.stages["big"].peak_rss - 50 * 1048576
+
+def test_session_writes_profiles(tmp_path, capsys):
+    parser = argparse.ArgumentParser()
+    ctf_profiling.add_arguments(parser)
+    args = parser.parse_args(["--timings", "--profile", str(tmp_path / "p.pstats"),
+                              "--flamegraph", str(tmp_path / "f.txt")])
+    with ctf_profiling.session(args) as timings:
+        with timings.stage("work"):
+            sum(range(200000))
+    assert (tmp_path / "p.pstats").stat().st_size > 0
+    assert (tmp_path / "f.txt").exists()
+    assert "work" in capsys.readouterr().err
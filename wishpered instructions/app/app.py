@@ -4,9 +4,58 @@ import re
 
 app = Flask(__name__, template_folder='templates')
 
-# Load the "system prompt" (contains the secret flag)
-with open(os.path.join(os.path.dirname(__file__), "system_prompt.txt"), "r") as f:
-    SYSTEM_PROMPT = f.read()
+BASE_DIR = os.path.dirname(__file__)
+
+# Default "system prompt" (contains the secret flag), used when no team is given
+DEFAULT_PROMPT_FILE = os.path.join(BASE_DIR, "system_prompt.txt")
+
+# Per-team prompts live in PROMPTS_DIR as <team_token>.txt. The token is handed
+# out to each team and doubles as the URL path (/t/<team_token>/), so teams
+# cannot guess each other's flags.
+PROMPTS_DIR = os.environ.get("PROMPTS_DIR", os.path.join(BASE_DIR, "prompts"))
+
+# With per-team prompts, "/" and "/chat" without a token must not hand out
+# system_prompt.txt. Off by default once PROMPTS_DIR is set, SERVE_DEFAULT_PROMPT
+# (1/0) overrides either way.
+SERVE_DEFAULT_PROMPT = os.environ.get(
+    "SERVE_DEFAULT_PROMPT", "0" if "PROMPTS_DIR" in os.environ else "1") == "1"
+TEAM_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# Rules are compiled once and shared by every team
+FOLLOW_INSTRUCTIONS_RE = re.compile(r"follow these instructions:(.*)$", flags=re.IGNORECASE|re.DOTALL)
+
+class PromptStore:
+    """
+    Lazily loads prompt files and caches them by path. Each lookup does a
+    single stat() so edited files are picked up without a restart.
+    """
+
+    def __init__(self):
+        self._cache = {}  # path -> (mtime_ns, size, prompt)
+
+    def get(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._cache.pop(path, None)
+            return None
+        cached = self._cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        with open(path, "r") as f:
+            prompt = f.read()
+        self._cache[path] = (st.st_mtime_ns, st.st_size, prompt)
+        return prompt
+
+PROMPTS = PromptStore()
+
+def team_prompt(team):
+    """Return the system prompt for a team token, or None if it is unknown"""
+    if not team:
+        return PROMPTS.get(DEFAULT_PROMPT_FILE) if SERVE_DEFAULT_PROMPT else None
+    if not TEAM_TOKEN_RE.fullmatch(team):
+        return None
+    return PROMPTS.get(os.path.join(PROMPTS_DIR, team + ".txt"))
 
 def naive_model(system_prompt: str, user_input: str) -> str:
     """
@@ -24,7 +73,7 @@ def naive_model(system_prompt: str, user_input: str) -> str:
         return f"(debug) system_prompt:\n{system_prompt}"
 
     # Rule 2: If user contains the pattern: "follow these (new) instructions:" then follow them
-    m = re.search(r"follow these instructions:(.*)$", user_input, flags=re.IGNORECASE|re.DOTALL)
+    m = FOLLOW_INSTRUCTIONS_RE.search(user_input)
     if m:
         # return the "new instructions" as if the assistant followed them
         new_instr = m.group(1).strip()
@@ -37,14 +86,23 @@ def naive_model(system_prompt: str, user_input: str) -> str:
     return f"I understood your request. You said: {summary}"
 
 @app.route("/")
-def index():
+@app.route("/t/<team>/")
+def index(team=None):
+    if team_prompt(team) is None:
+        return "Unknown team", 404
     return render_template("index.html")
 
 @app.route("/chat", methods=["POST"])
-def chat():
+@app.route("/t/<team>/chat", methods=["POST"])
+def chat(team=None):
+    # Team can also be picked with a header so one URL serves everyone
+    team = team or request.headers.get("X-Team-Token")
+    system_prompt = team_prompt(team)
+    if system_prompt is None:
+        return jsonify({"error": "unknown team"}), 404
     data = request.json or {}
     user_input = data.get("message", "")
-    response = naive_model(SYSTEM_PROMPT, user_input)
+    response = naive_model(system_prompt, user_input)
     return jsonify({"reply": response})
 
 if __name__ == "__main__":